@@ -0,0 +1,269 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import networkx as nx
+import numpy as np
+from simple_classifier import SimpleGraphClassifier
+
+# Component-partitioned processing.
+#
+# Forests and other disconnected inputs are split into connected components
+# once. Each component is laid out and classified on its own, in a process
+# pool when the graph is big enough to be worth it, and the component layouts
+# are packed side by side into a single layout for rendering.
+
+# Spring layout iterations, all on one cooling schedule
+LAYOUT_ITERATIONS = 50
+
+# Upper bound on the (rows x nodes) block of pairwise forces computed at once;
+# the deadline is checked between blocks
+LAYOUT_BLOCK_SIZE = 1 << 20
+
+# Pool processes per server worker. Kept small because every server worker
+# gets its own pool, so the total is this times the number of server workers.
+POOL_WORKERS = int(os.environ.get('GRAPH_WORKERS', 2))
+
+# Below this many nodes the pool overhead outweighs the parallel speedup
+PARALLEL_MIN_NODES = 500
+
+# Gap between packed components, relative to a unit-radius component
+PACK_PADDING = 0.3
+
+# Global worker pool, created on first use
+pool = None
+
+
+def get_pool():
+    """Return the process-wide worker pool, creating it on first use
+
+    Pool processes are spawned rather than forked, because forking a
+    threaded Flask server can copy locks held by other threads.
+    """
+    global pool
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=POOL_WORKERS,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    return pool
+
+
+def reset_pool():
+    """Drop a broken worker pool so the next call creates a fresh one"""
+    global pool
+    if pool is not None:
+        pool.shutdown(wait=False)
+        pool = None
+
+
+def split_components(edges):
+    """Split an edge list into one edge list per connected component
+
+    Components are ordered by their first edge in the input, and edges keep
+    their original order and direction within each component.
+    """
+    G = nx.Graph()
+    for edge in edges:
+        if len(edge) >= 2:
+            G.add_edge(edge[0], edge[1])
+
+    component_of = {}
+    for i, nodes in enumerate(nx.connected_components(G)):
+        for node in nodes:
+            component_of[node] = i
+
+    order = {}
+    components = []
+    for edge in edges:
+        if len(edge) < 2:
+            continue
+        i = component_of[edge[0]]
+        if i not in order:
+            order[i] = len(components)
+            components.append([])
+        components[order[i]].append(edge)
+    return components
+
+
+def run_components(func, args, total_nodes):
+    """Apply func to every component's arguments, in the pool if worthwhile"""
+    if len(args) < 2 or total_nodes < PARALLEL_MIN_NODES:
+        return [func(*a) for a in args]
+    try:
+        return list(get_pool().map(func, *zip(*args)))
+    except BrokenProcessPool:
+        # A pool process died; rebuild the pool and retry once
+        reset_pool()
+    try:
+        return list(get_pool().map(func, *zip(*args)))
+    except BrokenProcessPool:
+        reset_pool()
+        raise
+
+
+def spring_layout(G, deadline=None, k=3, iterations=LAYOUT_ITERATIONS, seed=42, threshold=1e-4):
+    """Fruchterman-Reingold spring layout that stops early when the deadline expires
+
+    Uses the same forces, initial temperature and linear cooling as the
+    force-directed method of nx.spring_layout, in a single run. Forces are
+    computed a block of rows at a time, which bounds memory on large graphs
+    and lets the deadline be checked many times per iteration.
+
+    Returns (pos, partial); partial is True if the deadline expired before
+    all iterations ran.
+    """
+    nodes = list(G)
+    n = len(nodes)
+    if n == 0:
+        return {}, False
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}, False
+
+    index = {node: i for i, node in enumerate(nodes)}
+    neighbors = [[index[v] for v in G[u]] for u in nodes]
+
+    pos = np.random.RandomState(seed).rand(n, 2)
+    t = max(np.ptp(pos[:, 0]), np.ptp(pos[:, 1])) * 0.1
+    dt = t / (iterations + 1)
+    rows = max(1, LAYOUT_BLOCK_SIZE // n)
+
+    partial = False
+    for _ in range(iterations):
+        displacement = np.empty((n, 2))
+        for start in range(0, n, rows):
+            if deadline and deadline.expired():
+                partial = True
+                break
+            stop = min(start + rows, n)
+            delta = pos[start:stop, np.newaxis, :] - pos[np.newaxis, :, :]
+            distance = np.linalg.norm(delta, axis=-1)
+            np.clip(distance, 0.01, None, out=distance)
+            adjacency = np.zeros((stop - start, n))
+            for i in range(start, stop):
+                adjacency[i - start, neighbors[i]] = 1.0
+            force = k * k / distance ** 2 - adjacency * distance / k
+            displacement[start:stop] = np.einsum('ijk,ij->ik', delta, force)
+        if partial:
+            # Keep the positions of the last complete iteration
+            break
+
+        length = np.linalg.norm(displacement, axis=-1)
+        length = np.where(length < 0.01, 0.1, length)
+        delta_pos = displacement * (t / length)[:, np.newaxis]
+        pos += delta_pos
+        t -= dt
+        if np.linalg.norm(delta_pos) / n < threshold:
+            break
+
+    # Center and scale into [-1, 1], as nx.rescale_layout does
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos /= extent
+    return dict(zip(nodes, pos)), partial
+
+
+def layout_component(edges, deadline=None):
+    """Lay out a single connected component; returns (pos, partial)"""
+    G = nx.Graph()
+    for edge in edges:
+        G.add_edge(edge[0], edge[1])
+    return spring_layout(G, deadline)
+
+
+def pack_layouts(layouts):
+    """Pack per-component layouts side by side into one layout in [-1, 1]
+
+    Each component is normalized to a disc whose radius grows with the square
+    root of its node count, then the discs are placed row by row, largest
+    first.
+    """
+    discs = []
+    for pos in layouts:
+        nodes = list(pos)
+        coords = np.array([pos[node] for node in nodes], dtype=np.float64)
+        coords -= coords.mean(axis=0)
+        extent = np.abs(coords).max()
+        radius = math.sqrt(len(nodes))
+        if extent > 0:
+            coords *= radius / extent
+        discs.append((radius, nodes, coords))
+    discs.sort(key=lambda disc: disc[0], reverse=True)
+
+    # Aim for a roughly square arrangement
+    row_width = math.sqrt(sum((2 * r + PACK_PADDING) ** 2 for r, _, _ in discs))
+    row_width = max(row_width, 2 * discs[0][0] + PACK_PADDING)
+
+    packed = {}
+    x = y = 0.0
+    row_height = 0.0
+    for radius, nodes, coords in discs:
+        size = 2 * radius + PACK_PADDING
+        if x > 0 and x + size > row_width:
+            x = 0.0
+            y -= row_height
+            row_height = 0.0
+        center = np.array([x + size / 2, y - size / 2])
+        for node, xy in zip(nodes, coords):
+            packed[node] = xy + center
+        x += size
+        row_height = max(row_height, size)
+
+    # Rescale the whole picture back into [-1, 1]
+    nodes = list(packed)
+    coords = np.array([packed[node] for node in nodes])
+    coords -= (coords.max(axis=0) + coords.min(axis=0)) / 2
+    extent = np.abs(coords).max()
+    if extent > 0:
+        coords /= extent
+    return {node: xy for node, xy in zip(nodes, coords)}
+
+
+def layout_components(edges, deadline=None):
+    """Lay out each component independently and pack the results
+
+    Returns (pos, partial); partial is True if any component's layout was cut
+    short by the deadline.
+    """
+    components = split_components(edges)
+    if not components:
+        return {}, False
+
+    total_nodes = sum(len({node for edge in c for node in edge[:2]}) for c in components)
+    results = run_components(layout_component, [(c, deadline) for c in components], total_nodes)
+    if len(results) == 1:
+        return results[0]
+
+    pos = pack_layouts([layout for layout, _ in results])
+    return pos, any(partial for _, partial in results)
+
+
+def classify_component(edges):
+    """Rule-based classification of a single connected component"""
+    result = SimpleGraphClassifier().simple_classify(edges)
+    nodes = {str(node) for edge in edges for node in edge[:2]}
+    result['nodes'] = len(nodes)
+    result['edges'] = len(edges)
+    return result
+
+
+def summarize(results):
+    """Summarize component classifications, e.g. '3 Trees + 1 Cycle'"""
+    counts = {}
+    for result in results:
+        counts[result['type']] = counts.get(result['type'], 0) + 1
+    parts = []
+    for graph_type, count in sorted(counts.items(), key=lambda item: -item[1]):
+        parts.append(f"{count} {graph_type}{'s' if count > 1 else ''}")
+    return ' + '.join(parts)
+
+
+def classify_components(edges):
+    """Classify each connected component; returns (results, summary)"""
+    components = split_components(edges)
+    if not components:
+        return [], ''
+
+    total_nodes = sum(len({node for edge in c for node in edge[:2]}) for c in components)
+    results = run_components(classify_component, [(c,) for c in components], total_nodes)
+    return results, summarize(results)
@@ -0,0 +1,49 @@
+import math
+import time
+
+# Request-level time budgets.
+#
+# Long-running loops (layout iterations, BFS) receive a Deadline and check it
+# cooperatively. When it expires they stop early and the endpoint returns a
+# best-effort result flagged with 'partial': True instead of holding the worker
+# until the client gives up.
+
+DEADLINE_HEADER = 'X-Request-Timeout'
+
+# Default budget in seconds per endpoint, used when the client sends no header
+DEFAULT_BUDGETS = {
+    'generate_graph': 10.0,
+    'shortest_path': 5.0,
+}
+
+# Upper bound on what a client may ask for
+MAX_BUDGET = 60.0
+
+
+class Deadline:
+    def __init__(self, budget):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        """Seconds left before the deadline, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """Whether the time budget has been used up"""
+        return time.monotonic() >= self.expires_at
+
+
+def request_deadline(request, endpoint):
+    """Build the deadline for a request from its header or the endpoint default"""
+    budget = DEFAULT_BUDGETS.get(endpoint, MAX_BUDGET)
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = None
+        # Ignore nan, infinities and non-positive values
+        if requested is not None and math.isfinite(requested) and requested > 0:
+            budget = requested
+    return Deadline(min(budget, MAX_BUDGET))
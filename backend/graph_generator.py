@@ -8,33 +8,121 @@ import base64
 import json
 import os
 from simple_classifier import load_classifier, classify_graph
+from graph_store import get_store, normalize_edges, node_index
+from deadline import request_deadline
+from components import layout_components, classify_components
 
 app = Flask(__name__)
 CORS(app)
 
-# Load ML model on startup
 MODEL_PATH = 'graph_classifier_model.pth'
-if os.path.exists(MODEL_PATH):
-    if load_classifier(MODEL_PATH):
-        print(f"Graph classifier loaded successfully from {MODEL_PATH}")
+
+def load_model():
+    """Load the ML model used by /classify"""
+    if os.path.exists(MODEL_PATH):
+        if load_classifier(MODEL_PATH):
+            print(f"Graph classifier loaded successfully from {MODEL_PATH}")
+        else:
+            print(f"Failed to load model from {MODEL_PATH}")
     else:
-        print(f"Failed to load model from {MODEL_PATH}")
-else:
-    print(f"Model file not found at {MODEL_PATH}")
+        print(f"Model file not found at {MODEL_PATH}")
+
+# Load ML model on startup. Spawned pool processes (components.get_pool)
+# re-import this module as __mp_main__ and do not need the model.
+if __name__ != '__mp_main__':
+    load_model()
+
+# Name under which spring layouts are cached in the shared graph store
+SPRING_LAYOUT = 'packed-spring-k3-i50-s42'
+
+# Rough cost of drawing one node label; labels are skipped when the remaining
+# budget cannot cover them
+LABEL_SECONDS_PER_NODE = 0.002
+
+# Image resolution for full renders and for renders past the deadline
+FULL_DPI = 150
+FAST_DPI = 72
+
+# Nodes expanded between deadline checks during the shortest-path search
+BFS_CHECK_INTERVAL = 1024
+
+def bfs_shortest_path(indptr, indices, start, end, deadline=None):
+    """Bidirectional BFS over CSR adjacency from start to end (node indices)
+
+    Expands the smaller frontier one level at a time, as networkx's
+    bidirectional shortest path does.
+
+    Returns (path, partial); path is a list of node indices, or None if no
+    path exists or the deadline expired before one was found.
+    """
+    if start == end:
+        return [start], False
+
+    # Parent of every node reached from each side
+    forward, backward = {start: None}, {end: None}
+    forward_fringe, backward_fringe = [start], [end]
+    expanded = 0
+    while forward_fringe and backward_fringe:
+        if len(forward_fringe) <= len(backward_fringe):
+            fringe, seen, other = forward_fringe, forward, backward
+        else:
+            fringe, seen, other = backward_fringe, backward, forward
+
+        next_fringe = []
+        meet = None
+        for u in fringe:
+            expanded += 1
+            if expanded % BFS_CHECK_INTERVAL == 0 and deadline and deadline.expired():
+                return None, True
+            for v in indices[indptr[u]:indptr[u + 1]].tolist():
+                if v not in seen:
+                    seen[v] = u
+                    next_fringe.append(v)
+                if v in other:
+                    meet = v
+                    break
+            if meet is not None:
+                break
+
+        if meet is not None:
+            path = []
+            node = meet
+            while node is not None:
+                path.append(node)
+                node = forward[node]
+            path.reverse()
+            node = backward[meet]
+            while node is not None:
+                path.append(node)
+                node = backward[node]
+            return path, False
+
+        if fringe is forward_fringe:
+            forward_fringe = next_fringe
+        else:
+            backward_fringe = next_fringe
+
+    return None, False
 
-def create_modern_graph(edges, visited_nodes=None, current_node=None, current_edge=None):
-    """Create a modern, beautiful graph visualization"""
+def create_modern_graph(edges, visited_nodes=None, current_node=None, current_edge=None, deadline=None):
+    """Create a modern, beautiful graph visualization
+
+    Returns (image, partial); partial is True if the deadline cut the layout
+    short or forced a cheaper render (small uniform nodes, no labels, lower
+    resolution).
+    """
     
-    # Create graph
+    # Create graph from the same normalized edges the store keys on, so a
+    # cached layout matches it whatever order the edges came in
+    edges = normalize_edges(edges)
     G = nx.Graph()
     
     # Add edges
     for edge in edges:
-        if len(edge) >= 2:
-            G.add_edge(edge[0], edge[1])
+        G.add_edge(edge[0], edge[1])
     
     if len(G.nodes()) == 0:
-        return None
+        return None, False
     
     # Set up the plot with modern styling
     plt.style.use('default')
@@ -42,8 +130,18 @@ def create_modern_graph(edges, visited_nodes=None, current_node=None, current_ed
     fig.patch.set_facecolor('#f8fafc')
     ax.set_facecolor('#ffffff')
     
-    # Use spring layout for better node positioning
-    pos = nx.spring_layout(G, k=3, iterations=50, seed=42)
+    # Use spring layout for better node positioning, laying out each connected
+    # component separately and reusing the layout any worker already computed
+    # for the same graph
+    store = get_store()
+    graph_key = store.register(edges)
+    pos = store.get_layout(graph_key, SPRING_LAYOUT)
+    partial = False
+    if pos is None:
+        pos, partial = layout_components(edges, deadline)
+        # Only complete layouts are worth sharing with other workers
+        if not partial:
+            store.put_layout(graph_key, SPRING_LAYOUT, pos)
     
     # Draw edges with modern styling
     edge_colors = []
@@ -58,6 +156,11 @@ def create_modern_graph(edges, visited_nodes=None, current_node=None, current_ed
             edge_colors.append('#e2e8f0')
             edge_widths.append(2)
     
+    # Out of time: keep the highlight colors but draw thin, uniform edges
+    if deadline and deadline.expired():
+        partial = True
+        edge_widths = 1
+    
     nx.draw_networkx_edges(G, pos, 
                           edge_color=edge_colors,
                           width=edge_widths,
@@ -79,20 +182,32 @@ def create_modern_graph(edges, visited_nodes=None, current_node=None, current_ed
             node_colors.append('#ffffff')  # White for unvisited
             node_sizes.append(1000)
     
+    # Out of time: keep the highlight colors but draw small, uniform nodes
+    if deadline and deadline.expired():
+        partial = True
+        node_sizes = 50
+        node_linewidths = 0.5
+    else:
+        node_linewidths = 3
+    
     # Draw nodes
     nx.draw_networkx_nodes(G, pos,
                           node_color=node_colors,
                           node_size=node_sizes,
                           edgecolors='#64748b',
-                          linewidths=3,
+                          linewidths=node_linewidths,
                           alpha=0.95)
     
-    # Draw labels with modern typography
-    nx.draw_networkx_labels(G, pos,
-                           font_size=16,
-                           font_weight='bold',
-                           font_family='Arial',
-                           font_color='#1e293b')
+    # Draw labels with modern typography, unless the remaining budget cannot
+    # cover one text object per node
+    if deadline and deadline.remaining() < len(G) * LABEL_SECONDS_PER_NODE:
+        partial = True
+    else:
+        nx.draw_networkx_labels(G, pos,
+                               font_size=16,
+                               font_weight='bold',
+                               font_family='Arial',
+                               font_color='#1e293b')
     
     # Remove axes and add subtle border
     ax.set_xlim(-1.2, 1.2)
@@ -103,33 +218,43 @@ def create_modern_graph(edges, visited_nodes=None, current_node=None, current_ed
     for spine in ax.spines.values():
         spine.set_visible(False)
     
-    plt.tight_layout()
+    # Out of time: skip the tight bounding box pass and render at lower dpi
+    fast = bool(deadline and deadline.expired())
+    partial = partial or fast
+    if not fast:
+        plt.tight_layout()
     
     # Convert to base64 string
     img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight', 
+    plt.savefig(img_buffer, format='png',
+                dpi=FAST_DPI if fast else FULL_DPI,
+                bbox_inches=None if fast else 'tight',
                 facecolor='#f8fafc', edgecolor='none')
     img_buffer.seek(0)
     img_string = base64.b64encode(img_buffer.read()).decode()
     plt.close()
     
-    return img_string
+    return img_string, partial
 
 @app.route('/generate_graph', methods=['POST'])
 def generate_graph():
     try:
         data = request.json
         edges = data.get('edges', [])
-        visited_nodes = set(data.get('visited_nodes', []))
+        visited_nodes = {str(node) for node in data.get('visited_nodes', [])}
         current_node = data.get('current_node')
+        if current_node is not None:
+            current_node = str(current_node)
         current_edge = data.get('current_edge')
+        deadline = request_deadline(request, 'generate_graph')
         
-        img_string = create_modern_graph(edges, visited_nodes, current_node, current_edge)
+        img_string, partial = create_modern_graph(edges, visited_nodes, current_node, current_edge, deadline)
         
         if img_string:
             return jsonify({
                 'success': True,
-                'image': f"data:image/png;base64,{img_string}"
+                'image': f"data:image/png;base64,{img_string}",
+                'partial': partial
             })
         else:
             return jsonify({'success': False, 'error': 'No graph data provided'})
@@ -144,10 +269,13 @@ def classify_graph_endpoint():
         edges = data.get('edges', [])
         
         result = classify_graph(edges)
+        components, summary = classify_components(edges)
         
         return jsonify({
             'success': True,
-            'classification': result
+            'classification': result,
+            'components': components,
+            'summary': summary
         })
         
     except Exception as e:
@@ -164,29 +292,46 @@ def shortest_path():
         edges = data.get('edges', [])
         start_node = data.get('start')
         end_node = data.get('end')
+        deadline = request_deadline(request, 'shortest_path')
         
         if not edges or not start_node or not end_node:
             return jsonify({'error': 'Missing edges, start node, or end node'}), 400
         
-        # Create graph
-        G = nx.Graph()
-        for edge in edges:
-            if len(edge) >= 2:
-                source = str(edge[0])
-                target = str(edge[1])
-                G.add_edge(source, target)
+        # Register the graph and attach to its shared CSR adjacency
+        store = get_store()
+        graph_key = store.register(edges)
+        graph = store.load(graph_key)
+        if graph is None:
+            # Evicted by another worker between register and load
+            graph_key = store.register(edges)
+            graph = store.load(graph_key)
+        if graph is None:
+            return jsonify({'error': 'Graph store is busy, please retry'}), 503
+        nodes, indptr, indices = graph
         
         # Check if nodes exist
-        start_str = str(start_node)
-        end_str = str(end_node)
+        start = node_index(nodes, str(start_node))
+        end = node_index(nodes, str(end_node))
         
-        if start_str not in G.nodes() or end_str not in G.nodes():
+        if start < 0 or end < 0:
             return jsonify({'error': 'Start or end node not found in graph'}), 400
         
         # Calculate shortest path
         try:
-            path = nx.shortest_path(G, source=start_str, target=end_str)
-            length = nx.shortest_path_length(G, source=start_str, target=end_str)
+            path_ids, partial = bfs_shortest_path(indptr, indices, start, end, deadline)
+            if partial:
+                return jsonify({
+                    'path': [],
+                    'length': -1,
+                    'edges': [],
+                    'exists': False,
+                    'partial': True,
+                    'error': 'Deadline exceeded before a path was found'
+                })
+            if path_ids is None:
+                raise nx.NetworkXNoPath()
+            path = [str(nodes[i]) for i in path_ids]
+            length = len(path) - 1
             
             # Get path edges
             path_edges = []
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+import numpy as np
+
+# On-disk graph store shared by every server worker process.
+#
+# Each registered graph lives in its own directory named after the hash of its
+# normalized edge list (string labels, deduplicated, sorted):
+#
+#   <root>/<graph hash>/nodes.npy       sorted node labels (fixed-width unicode)
+#   <root>/<graph hash>/indptr.npy      CSR row pointers (int64)
+#   <root>/<graph hash>/indices.npy     CSR column indices (int64)
+#   <root>/<graph hash>/layout-<name>.npy   cached (n, 2) node positions
+#
+# Arrays are opened with np.load(mmap_mode='r'), so every worker attaches to the
+# same page-cache pages instead of holding its own copy, and the data survives
+# worker restarts. Node labels are sorted, so looking a node up is a binary
+# search over the mapped array rather than a per-process dict. All writes go to
+# a temporary path first and are moved into place with an atomic rename, so
+# concurrent workers never see partial files.
+#
+# The store keeps at most MAX_GRAPHS graphs; registering a new one evicts the
+# least recently used directories (by modification time, refreshed on every
+# registration) and removes temporary files left behind by crashed workers.
+
+STORE_DIR = os.environ.get('GRAPH_STORE_DIR', 'graph_store')
+
+# Graphs kept on disk before the least recently used are evicted
+MAX_GRAPHS = int(os.environ.get('GRAPH_STORE_MAX_GRAPHS', 1000))
+
+# Graphs each process keeps attached
+MAX_ATTACHED = 64
+
+# Age in seconds after which a temporary file is considered abandoned
+STALE_TMP_SECONDS = 600
+
+TMP_PREFIX = '.tmp-'
+
+
+def normalize_edges(edges):
+    """Return the usable edges as sorted, deduplicated pairs of string labels"""
+    pairs = set()
+    for edge in edges:
+        if len(edge) >= 2:
+            pairs.add(tuple(sorted((str(edge[0]), str(edge[1])))))
+    return [list(pair) for pair in sorted(pairs)]
+
+
+def graph_hash(edges):
+    """Hash an edge list; the same graph always maps to the same key"""
+    payload = json.dumps(normalize_edges(edges), separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def node_index(nodes, label):
+    """Position of a label in a graph's sorted node array, or -1"""
+    i = int(np.searchsorted(nodes, label))
+    if i < len(nodes) and nodes[i] == label:
+        return i
+    return -1
+
+
+class GraphStore:
+    def __init__(self, root=STORE_DIR, max_graphs=MAX_GRAPHS, max_attached=MAX_ATTACHED):
+        self.root = root
+        self.max_graphs = max_graphs
+        self.max_attached = max_attached
+        os.makedirs(self.root, exist_ok=True)
+        # Per-process handles to recently attached graphs, least recent first
+        self._graphs = OrderedDict()
+
+    def _path(self, key, name=''):
+        return os.path.join(self.root, key, name)
+
+    def _exists(self, key):
+        return os.path.isdir(self._path(key))
+
+    def register(self, edges):
+        """Store a graph's nodes and CSR adjacency once and return its hash"""
+        key = graph_hash(edges)
+        if self._exists(key):
+            # Mark as recently used for eviction
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            return key
+
+        edges = normalize_edges(edges)
+        nodes = sorted({node for edge in edges for node in edge})
+        index = {node: i for i, node in enumerate(nodes)}
+        neighbors = [[] for _ in nodes]
+        for source, target in edges:
+            u, v = index[source], index[target]
+            neighbors[u].append(v)
+            if u != v:
+                neighbors[v].append(u)
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(adj) for adj in neighbors])
+        indices = np.array([v for adj in neighbors for v in adj], dtype=np.int64)
+
+        tmp_dir = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=self.root)
+        try:
+            np.save(os.path.join(tmp_dir, 'nodes.npy'), np.array(nodes, dtype=str))
+            np.save(os.path.join(tmp_dir, 'indptr.npy'), indptr)
+            np.save(os.path.join(tmp_dir, 'indices.npy'), indices)
+            os.rename(tmp_dir, self._path(key))
+        except OSError:
+            # Another worker registered the same graph first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(self._path(key)):
+                raise
+        else:
+            self.evict()
+        return key
+
+    def load(self, key):
+        """Attach to a stored graph; returns (nodes, indptr, indices) or None"""
+        if key in self._graphs:
+            self._graphs.move_to_end(key)
+            return self._graphs[key]
+
+        try:
+            graph = (
+                np.load(self._path(key, 'nodes.npy'), mmap_mode='r'),
+                np.load(self._path(key, 'indptr.npy'), mmap_mode='r'),
+                np.load(self._path(key, 'indices.npy'), mmap_mode='r'),
+            )
+        except OSError:
+            # Not registered, or evicted by another worker
+            return None
+
+        self._graphs[key] = graph
+        while len(self._graphs) > self.max_attached:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def get_layout(self, key, name):
+        """Return a cached layout as a {node: (x, y)} dict, or None"""
+        graph = self.load(key)
+        if graph is None:
+            return None
+        try:
+            coords = np.load(self._path(key, f'layout-{name}.npy'), mmap_mode='r')
+        except OSError:
+            return None
+        return dict(zip(graph[0].tolist(), coords))
+
+    def put_layout(self, key, name, pos):
+        """Cache a {node: (x, y)} layout for a registered graph"""
+        graph = self.load(key)
+        if graph is None:
+            return
+
+        coords = np.array([pos[node] for node in graph[0].tolist()], dtype=np.float64)
+        fd, tmp_path = tempfile.mkstemp(prefix=TMP_PREFIX, suffix='.npy', dir=self.root)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, coords)
+            os.replace(tmp_path, self._path(key, f'layout-{name}.npy'))
+        except OSError:
+            # The graph was evicted meanwhile; the layout is simply not cached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """Remove stale temporary files and the least recently used graphs"""
+        now = time.time()
+        graphs = []
+        for entry in os.scandir(self.root):
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if entry.name.startswith(TMP_PREFIX):
+                if now - mtime > STALE_TMP_SECONDS:
+                    if entry.is_dir():
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+            elif entry.is_dir():
+                graphs.append((mtime, entry.path))
+
+        graphs.sort()
+        for _, path in graphs[:max(0, len(graphs) - self.max_graphs)]:
+            # Move the graph out of the way atomically before deleting it, so
+            # other workers see it either complete or gone. Workers that still
+            # have it mapped keep their pages.
+            doomed = os.path.join(self.root, f'{TMP_PREFIX}{os.getpid()}-{os.path.basename(path)}')
+            try:
+                os.rename(path, doomed)
+            except OSError:
+                continue
+            shutil.rmtree(doomed, ignore_errors=True)
+
+
+# Global store instance
+store = None
+
+
+def get_store():
+    """Return the process-wide graph store, creating it on first use"""
+    global store
+    if store is None:
+        store = GraphStore()
+    return store
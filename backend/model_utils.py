@@ -47,8 +47,8 @@ class GraphClassifier:
         
         # Check for cycles (convert to undirected for cycle detection)
         try:
-            # Simple cycle detection
-            has_cycle = len(list(nx.simple_cycles(nx.DiGraph(G.edges())))) > 0
+            # Linear-time cycle detection instead of enumerating every cycle
+            has_cycle = not nx.is_directed_acyclic_graph(nx.DiGraph(G.edges()))
             features.append(int(has_cycle))
         except:
             features.append(0)
@@ -21,10 +21,9 @@ class SimpleGraphClassifier:
         if G.number_of_nodes() == 0:
             return {'type': 'Unknown', 'confidence': 0.0}
         
-        # Check for cycles
+        # Check for cycles (linear time, no need to enumerate them all)
         try:
-            cycles = list(nx.simple_cycles(G))
-            has_cycle = len(cycles) > 0
+            has_cycle = not nx.is_directed_acyclic_graph(G)
         except:
             has_cycle = False
         
@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+from components import pack_layouts, spring_layout, split_components, summarize
+from deadline import Deadline
+
+
+def test_split_components_keeps_input_order_and_direction():
+    edges = [[3, 4], [1, 2], [5, 3], [2, 6], [7]]
+    assert split_components(edges) == [
+        [[3, 4], [5, 3]],
+        [[1, 2], [2, 6]],
+    ]
+
+
+def test_split_components_empty():
+    assert split_components([]) == []
+
+
+def test_pack_layouts_stays_inside_unit_square():
+    layouts = [
+        {'a': np.array([0.0, 0.0]), 'b': np.array([5.0, 3.0]), 'c': np.array([-2.0, 1.0])},
+        {'d': np.array([10.0, 10.0]), 'e': np.array([11.0, 10.0])},
+        {'f': np.array([0.0, 0.0])},
+    ]
+    pos = pack_layouts(layouts)
+
+    assert set(pos) == {'a', 'b', 'c', 'd', 'e', 'f'}
+    coords = np.array(list(pos.values()))
+    assert np.all(np.abs(coords) <= 1.0 + 1e-9)
+    assert np.isclose(np.abs(coords).max(), 1.0)
+
+
+def test_summarize_counts_and_pluralizes():
+    results = [{'type': 'Tree'}, {'type': 'Cycle'}, {'type': 'Tree'}, {'type': 'Tree'}]
+    assert summarize(results) == '3 Trees + 1 Cycle'
+    assert summarize([{'type': 'DAG'}]) == '1 DAG'
+    assert summarize([]) == ''
+
+
+def test_spring_layout_is_scaled_and_complete():
+    pos, partial = spring_layout(nx.path_graph(20))
+    assert not partial
+    assert len(pos) == 20
+    assert np.isclose(np.abs(np.array(list(pos.values()))).max(), 1.0)
+
+
+def test_spring_layout_stops_at_deadline():
+    pos, partial = spring_layout(nx.path_graph(20), Deadline(0))
+    assert partial
+    assert len(pos) == 20
@@ -0,0 +1,30 @@
+import time
+import matplotlib
+matplotlib.use('Agg')
+import graph_generator
+from deadline import Deadline
+from graph_store import GraphStore
+
+
+def test_tiny_budget_on_large_graph_returns_quickly(tmp_path, monkeypatch):
+    store = GraphStore(str(tmp_path))
+    monkeypatch.setattr(graph_generator, 'get_store', lambda: store)
+    edges = [[i, i + 1] for i in range(5000)]
+
+    started = time.monotonic()
+    image, partial = graph_generator.create_modern_graph(edges, deadline=Deadline(0.5))
+    elapsed = time.monotonic() - started
+
+    assert image
+    assert partial
+    assert elapsed < 10
+
+
+def test_generous_budget_renders_in_full(tmp_path, monkeypatch):
+    store = GraphStore(str(tmp_path))
+    monkeypatch.setattr(graph_generator, 'get_store', lambda: store)
+
+    image, partial = graph_generator.create_modern_graph([[1, 2], [2, 3]], deadline=Deadline(60))
+
+    assert image
+    assert not partial
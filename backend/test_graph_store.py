@@ -0,0 +1,80 @@
+import os
+import numpy as np
+from graph_store import GraphStore, graph_hash, node_index, normalize_edges
+
+
+def test_normalize_edges_ignores_order_duplicates_and_label_types():
+    edges = [[2, 1], ['1', '2'], [1, 3], [3]]
+    assert normalize_edges(edges) == [['1', '2'], ['1', '3']]
+    assert graph_hash(edges) == graph_hash([['3', '1'], ['1', '2']])
+
+
+def test_register_and_load_round_trip(tmp_path):
+    store = GraphStore(str(tmp_path))
+    key = store.register([['b', 'a'], ['b', 'c'], ['a', 'b']])
+
+    nodes, indptr, indices = store.load(key)
+    assert nodes.tolist() == ['a', 'b', 'c']
+    assert indptr.tolist() == [0, 1, 3, 4]
+    assert sorted(indices[indptr[1]:indptr[2]].tolist()) == [0, 2]
+    assert node_index(nodes, 'c') == 2
+    assert node_index(nodes, 'd') == -1
+
+    # A fresh process attaches to the same files
+    assert GraphStore(str(tmp_path)).load(key)[0].tolist() == ['a', 'b', 'c']
+
+
+def test_layout_round_trip(tmp_path):
+    store = GraphStore(str(tmp_path))
+    key = store.register([[1, 2], [2, 3]])
+    assert store.get_layout(key, 'spring') is None
+
+    store.put_layout(key, 'spring', {'1': (0.0, 1.0), '2': (0.5, 0.5), '3': (1.0, 0.0)})
+    pos = GraphStore(str(tmp_path)).get_layout(key, 'spring')
+    assert set(pos) == {'1', '2', '3'}
+    assert np.allclose(pos['2'], [0.5, 0.5])
+
+
+def test_register_race_keeps_existing_graph(tmp_path):
+    first = GraphStore(str(tmp_path))
+    key = first.register([[1, 2]])
+
+    # Simulate a second worker that checked before the first one renamed
+    second = GraphStore(str(tmp_path))
+    second._exists = lambda key: False
+    assert second.register([[1, 2]]) == key
+    assert second.load(key)[0].tolist() == ['1', '2']
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+
+
+def test_evicts_least_recently_used_graphs(tmp_path):
+    store = GraphStore(str(tmp_path))
+    keys = [store.register([[i, i + 1]]) for i in range(3)]
+    for i, key in enumerate(keys):
+        os.utime(tmp_path / key, (i, i))
+
+    store.max_graphs = 2
+    store.register([[10, 11]])
+    assert not (tmp_path / keys[0]).exists()
+    assert not (tmp_path / keys[1]).exists()
+    assert (tmp_path / keys[2]).exists()
+
+
+def test_evict_removes_stale_temporary_files(tmp_path):
+    stale = tmp_path / '.tmp-crashed'
+    stale.mkdir()
+    os.utime(stale, (0, 0))
+    fresh = tmp_path / '.tmp-in-progress'
+    fresh.mkdir()
+
+    GraphStore(str(tmp_path)).evict()
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_attached_graphs_are_bounded(tmp_path):
+    store = GraphStore(str(tmp_path), max_attached=2)
+    keys = [store.register([[i, i + 1]]) for i in range(3)]
+    for key in keys:
+        store.load(key)
+    assert list(store._graphs) == keys[1:]